@@ -234,9 +234,8 @@ class ArbitrageBotDataCollection:
         """Handle price updates - main trading logic."""
         now = datetime.now()
         
-        # Calculate spreads
-        entry_spread = prices.get_entry_spread()
-        exit_spread = prices.get_exit_spread()
+        # Calculate spreads (one pass over the books for both)
+        entry_spread, exit_spread = prices.get_spreads()
         funding = self.get_funding_rate()
         
         is_opportunity = entry_spread > config.MIN_SPREAD_THRESHOLD
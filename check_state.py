@@ -1,6 +1,6 @@
 import requests
-import json
 import config
+from trade_events import trade_events
 
 def get_state():
     headers = {'Content-Type': 'application/json'}
@@ -94,13 +94,11 @@ def get_state():
             print(f"Error fetching orders: {e}")
 
         print('\n=== TRADE EVENTS (Last 5) ===')
-        try:
-            with open('trade_events.json') as f:
-                data = json.load(f)
-                for e in data.get('events', [])[-5:]:
-                    print(f"{e.get('timestamp')} - {e.get('message')}")
-        except FileNotFoundError:
-            print('No trade_events.json found')
+        events = trade_events.get_events(limit=5)
+        if not events:
+            print('No trade events recorded yet.')
+        for e in events:
+            print(f"{e.get('timestamp')} - {e.get('message')}")
     except Exception as e:
         print(f"Error: {e}")
 
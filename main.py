@@ -16,18 +16,37 @@ import signal
 import sys
 import argparse
 import logging
+from logging.handlers import MemoryHandler
+
+try:
+    # libuv-based event loop: noticeably lower per-callback overhead and
+    # wakeup jitter than the default selector loop
+    import uvloop
+    uvloop.install()
+except ImportError:
+    pass
 
 import config
 from bot import ArbitrageBot
 from websocket_manager import WebSocketManager
 
-# Configure root logger
+# Configure root logger. The file handler sits behind a MemoryHandler so
+# per-tick logging doesn't hit the disk on every record - the buffer is
+# written out every 1000 records or immediately on ERROR (and at
+# shutdown via logging.shutdown).
+_file_handler = logging.FileHandler('arbitrage_bot.log')
+# basicConfig only formats the handlers in its own list - the
+# MemoryHandler never formats, its target does, so the FileHandler
+# needs the formatter set explicitly
+_file_handler.setFormatter(
+    logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+)
 logging.basicConfig(
     level=getattr(logging, config.LOG_LEVEL),
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
     handlers=[
         logging.StreamHandler(sys.stdout),
-        logging.FileHandler('arbitrage_bot.log')
+        MemoryHandler(capacity=1000, flushLevel=logging.ERROR, target=_file_handler)
     ]
 )
 logger = logging.getLogger(__name__)
@@ -49,7 +68,14 @@ def print_banner():
 
 
 async def test_connection():
-    """Test WebSocket connection and show sample data."""
+    """Test WebSocket connection and show sample data.
+
+    Note: WebSocketManager extracts top-of-book from inbound frames with
+    a substring scan, only falling back to a full JSON parse for frames
+    with unexpected shapes. Callbacks registered here receive the parsed
+    PriceState, not the frame itself, so they are unaffected by the wire
+    format.
+    """
     print("\n🔌 Testing WebSocket connection...\n")
     
     manager = WebSocketManager()
@@ -58,29 +84,50 @@ async def test_connection():
         print("\n✅ Connection successful!")
         print("\n📊 Fetching sample prices for 10 seconds...\n")
         
-        # Create a task to show prices
+        # Buffer price lines and flush in batches - a print per tick
+        # would block the websocket loop on stdout flushes
+        from collections import deque
         received_count = [0]
-        
+        output_buffer = deque()
+
+        # Bind hot config values once - module attribute lookups cost a
+        # dict access per tick inside the callback
+        min_spread = config.MIN_SPREAD_THRESHOLD
+
         def on_update(prices):
             received_count[0] += 1
             spread = prices.get_entry_spread()
-            threshold_met = "🟢 ENTRY" if spread > config.MIN_SPREAD_THRESHOLD else "⚪️"
-            print(f"[{received_count[0]:3d}] Spot: ${prices.spot.best_ask:.4f} | "
-                  f"Perp: ${prices.perp.best_bid:.4f} | "
-                  f"Spread: {spread*100:+.4f}% {threshold_met}")
-        
+            threshold_met = "🟢 ENTRY" if spread > min_spread else "⚪️"
+            output_buffer.append(f"[{received_count[0]:3d}] Spot: ${prices.spot.best_ask:.4f} | "
+                                 f"Perp: ${prices.perp.best_bid:.4f} | "
+                                 f"Spread: {spread*100:+.4f}% {threshold_met}\n")
+
+        def flush_output():
+            if output_buffer:
+                sys.stdout.write("".join(output_buffer))
+                output_buffer.clear()
+                sys.stdout.flush()
+
+        async def print_loop():
+            while True:
+                await asyncio.sleep(0.1)
+                flush_output()
+
         manager = WebSocketManager(on_price_update=on_update)
-        
+
         # Run for 10 seconds
         try:
             async def run_for_seconds(seconds):
                 task = asyncio.create_task(manager.connect())
+                printer = asyncio.create_task(print_loop())
                 await asyncio.sleep(seconds)
                 await manager.disconnect()
                 task.cancel()
-            
+                printer.cancel()
+                flush_output()
+
             await run_for_seconds(10)
-            
+
         except asyncio.CancelledError:
             pass
         
@@ -103,15 +150,19 @@ async def run_bot(live_mode: bool = False):
         logger.info("📝 DRY RUN MODE - No real orders will be placed")
     
     bot = ArbitrageBot()
-    
-    # Handle graceful shutdown
-    def signal_handler(sig, frame):
+
+    # Handle graceful shutdown. Register on the running loop rather than
+    # via signal.signal - create_task from an OS-level handler is unsafe
+    # and can silently drop the shutdown coroutine.
+    loop = asyncio.get_running_loop()
+
+    def signal_handler():
         logger.info("\n🛑 Shutdown signal received...")
         asyncio.create_task(shutdown(bot))
-    
-    signal.signal(signal.SIGINT, signal_handler)
-    signal.signal(signal.SIGTERM, signal_handler)
-    
+
+    loop.add_signal_handler(signal.SIGINT, signal_handler)
+    loop.add_signal_handler(signal.SIGTERM, signal_handler)
+
     await bot.run()
 
 
@@ -120,12 +171,14 @@ async def shutdown(bot: ArbitrageBot):
     logger.info("Shutting down bot...")
     if bot.ws_manager:
         await bot.ws_manager.disconnect()
-    
-    # Cancel all running tasks
+
+    # Cancel all running tasks and wait for the cancellations to land,
+    # so no reconnect loops or sockets outlive the shutdown
     tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
     for task in tasks:
         task.cancel()
-    
+    await asyncio.gather(*tasks, return_exceptions=True)
+
     logger.info("Shutdown complete")
 
 
@@ -184,7 +237,7 @@ def main():
     except KeyboardInterrupt:
         print("\n\n🛑 Bot stopped by user")
     except Exception as e:
-        logger.exception(f"Fatal error: {e}")
+        logger.exception("Fatal error: %s", e)
         sys.exit(1)
 
 
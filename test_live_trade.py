@@ -13,17 +13,41 @@ Use this to verify the full trading flow with real funds.
 """
 
 import asyncio
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict, Any, Tuple
 import json
 
+import requests
+from requests.adapters import HTTPAdapter
+
 from hyperliquid.info import Info
 from hyperliquid.exchange import Exchange
 from hyperliquid.utils import constants
 from eth_account import Account
 
 import config
+from trade_events import trade_events
+
+# Hyperliquid taker fee (0.025%)
+TAKER_FEE = 0.00025
+
+# Aggressive limit multipliers (0.1% through the book) to ensure IOC fills
+ENTRY_SPOT_MULT = 1.001   # buy spot slightly above ask
+ENTRY_PERP_MULT = 0.999   # short perp slightly below bid
+EXIT_SPOT_MULT = 0.999    # sell spot slightly below bid
+EXIT_PERP_MULT = 1.001    # close short slightly above ask
+
+
+def _as_float(value, default: float = 0.0) -> float:
+    """Coerce an API value to float without re-parsing actual numbers."""
+    if type(value) is float:
+        return value
+    if value is None:
+        return default
+    return float(value)
 
 
 class LiveTradingTest:
@@ -37,7 +61,17 @@ class LiveTradingTest:
             constants.MAINNET_API_URL,
             account_address=config.ACCOUNT_ADDRESS  # Main wallet
         )
-        
+
+        # Share one keep-alive session between both SDK clients so every
+        # snapshot/order call reuses the same TLS connections instead of
+        # paying a fresh handshake
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        self.info.session = session
+        self.exchange.session = session
+
         # Trade tracking
         self.entry_spot_fill = None
         self.entry_perp_fill = None
@@ -48,50 +82,65 @@ class LiveTradingTest:
         self.total_fees = 0.0
         self.spot_fees = 0.0
         self.perp_fees = 0.0
+
+        # Pool for firing both legs of a trade at the same time
+        self._executor = ThreadPoolExecutor(max_workers=2)
+
+        # Cached meta() universe, keyed by asset name
+        self._meta_cache = None
+        self._meta_ts = 0.0
         
     def get_account_state(self) -> Dict:
         """Get current account state."""
         try:
-            # Get spot balances
-            spot_state = self.info.spot_user_state(config.ACCOUNT_ADDRESS)
-            
-            # Get perp state
-            perp_state = self.info.user_state(config.ACCOUNT_ADDRESS)
-            
+            # Spot balances and perp state are independent calls - fetch both at once
+            spot_future = self._executor.submit(self.info.spot_user_state, config.ACCOUNT_ADDRESS)
+            perp_future = self._executor.submit(self.info.user_state, config.ACCOUNT_ADDRESS)
+
             return {
-                "spot": spot_state,
-                "perp": perp_state
+                "spot": spot_future.result(),
+                "perp": perp_future.result()
             }
         except Exception as e:
             print(f"❌ Error getting account state: {e}")
             return {}
-    
+
+    @staticmethod
+    def _top_of_book(book: Dict) -> Tuple[float, float]:
+        """Extract best bid/ask from an L2 snapshot, ignoring deeper levels."""
+        try:
+            bids, asks = book["levels"]
+        except (KeyError, ValueError, TypeError):
+            return 0.0, 0.0
+        bid = float(bids[0]["px"]) if bids else 0.0
+        ask = float(asks[0]["px"]) if asks else 0.0
+        return bid, ask
+
     def get_current_prices(self) -> Tuple[float, float, float, float]:
         """Get current spot and perp prices."""
         try:
-            # Get L2 book for spot
-            spot_book = self.info.l2_snapshot(config.SPOT_SYMBOL)
-            spot_bid = float(spot_book["levels"][0][0]["px"]) if spot_book["levels"][0] else 0
-            spot_ask = float(spot_book["levels"][1][0]["px"]) if spot_book["levels"][1] else 0
-            
-            # Get L2 book for perp
-            perp_book = self.info.l2_snapshot(config.PERP_SYMBOL)
-            perp_bid = float(perp_book["levels"][0][0]["px"]) if perp_book["levels"][0] else 0
-            perp_ask = float(perp_book["levels"][1][0]["px"]) if perp_book["levels"][1] else 0
-            
+            # Fetch both L2 books concurrently so the quotes are from the
+            # same moment (and half the latency)
+            spot_future = self._executor.submit(self.info.l2_snapshot, config.SPOT_SYMBOL)
+            perp_future = self._executor.submit(self.info.l2_snapshot, config.PERP_SYMBOL)
+            spot_bid, spot_ask = self._top_of_book(spot_future.result())
+            perp_bid, perp_ask = self._top_of_book(perp_future.result())
+
             return spot_bid, spot_ask, perp_bid, perp_ask
         except Exception as e:
             print(f"❌ Error getting prices: {e}")
             return 0, 0, 0, 0
     
     def get_funding_rate(self) -> float:
-        """Get current HYPE funding rate."""
+        """Get current HYPE funding rate (meta() cached for 30s)."""
         try:
-            meta = self.info.meta()
-            for asset in meta.get("universe", []):
-                if asset.get("name") == config.PERP_SYMBOL:
-                    return float(asset.get("funding", 0))
-            return 0.0
+            # meta() returns the entire universe - fetch it at most every
+            # 30s and keep a name->asset dict for O(1) lookups
+            if self._meta_cache is None or time.monotonic() - self._meta_ts > 30:
+                universe = self.info.meta().get("universe", [])
+                self._meta_cache = {a.get("name"): a for a in universe}
+                self._meta_ts = time.monotonic()
+            return float(self._meta_cache.get(config.PERP_SYMBOL, {}).get("funding", 0))
         except Exception as e:
             print(f"❌ Error getting funding rate: {e}")
             return 0.0
@@ -132,36 +181,38 @@ class LiveTradingTest:
         if result.get("status") != "ok":
             print(f"   ❌ Order failed: {result}")
             return {"success": False, "error": str(result)}
-        
-        response = result.get("response", {})
-        if response.get("type") == "order":
-            data = response.get("data", {})
-            statuses = data.get("statuses", [])
-            
-            for status in statuses:
-                if "filled" in status:
-                    filled = status["filled"]
-                    total_sz = float(filled.get("totalSz", 0))
-                    avg_px = float(filled.get("avgPx", 0))
-                    
-                    # Calculate fee (taker fee is typically 0.025%)
-                    fee = total_sz * avg_px * 0.00025
-                    self.total_fees += fee
-                    
-                    print(f"   ✅ Filled: {total_sz} @ ${avg_px:.4f}")
-                    print(f"   💰 Estimated fee: ${fee:.4f}")
-                    
-                    return {
-                        "success": True,
-                        "size": total_sz,
-                        "price": avg_px,
-                        "fee": fee,
-                        "oid": filled.get("oid")
-                    }
-                elif "error" in status:
-                    print(f"   ❌ Error: {status['error']}")
-                    return {"success": False, "error": status["error"]}
-        
+
+        # Destructure once instead of chained .get() calls that each
+        # allocate a fresh default dict
+        try:
+            statuses = result["response"]["data"]["statuses"]
+        except (KeyError, TypeError):
+            print(f"   ⚠️ Unknown result: {result}")
+            return {"success": False, "error": "Unknown result format"}
+
+        for status in statuses:
+            filled = status.get("filled")
+            if filled is not None:
+                total_sz = _as_float(filled.get("totalSz"))
+                avg_px = _as_float(filled.get("avgPx"))
+
+                fee = total_sz * avg_px * TAKER_FEE
+                self.total_fees += fee
+
+                print(f"   ✅ Filled: {total_sz} @ ${avg_px:.4f}")
+                print(f"   💰 Estimated fee: ${fee:.4f}")
+
+                return {
+                    "success": True,
+                    "size": total_sz,
+                    "price": avg_px,
+                    "fee": fee,
+                    "oid": filled.get("oid")
+                }
+            if "error" in status:
+                print(f"   ❌ Error: {status['error']}")
+                return {"success": False, "error": status["error"]}
+
         print(f"   ⚠️ Unknown result: {result}")
         return {"success": False, "error": "Unknown result format"}
     
@@ -221,23 +272,21 @@ class LiveTradingTest:
         print("-" * 40)
         
         # Use slightly aggressive prices to ensure fill
-        entry_spot_price = round(spot_ask * 1.001, 4)  # 0.1% above ask
-        entry_perp_price = round(perp_bid * 0.999, 4)  # 0.1% below bid
-        
-        # Place spot buy
-        spot_result = self.place_spot_order(
-            is_buy=True,
-            size=size,
-            price=entry_spot_price
-        )
-        self.entry_spot_fill = self.parse_order_result(spot_result, "Spot Buy")
+        entry_spot_price = round(spot_ask * ENTRY_SPOT_MULT, 4)
+        entry_perp_price = round(perp_bid * ENTRY_PERP_MULT, 4)
         
-        # Place perp short
-        perp_result = self.place_perp_order(
-            is_buy=False,
-            size=size,
-            price=entry_perp_price
+        # Fire both legs at once - serial placement doubles the window
+        # where the spread can move against the hedge
+        spot_future = self._executor.submit(
+            self.place_spot_order, True, size, entry_spot_price
+        )
+        perp_future = self._executor.submit(
+            self.place_perp_order, False, size, entry_perp_price
         )
+        spot_result = spot_future.result()
+        perp_result = perp_future.result()
+
+        self.entry_spot_fill = self.parse_order_result(spot_result, "Spot Buy")
         self.entry_perp_fill = self.parse_order_result(perp_result, "Perp Short")
         
         # Check if entry was successful
@@ -251,10 +300,10 @@ class LiveTradingTest:
         # Step 5: Wait briefly
         print("\n⏳ STEP 5: Holding position for 5 seconds...")
         print("-" * 40)
-        for i in range(5, 0, -1):
-            print(f"   {i}...", end="\r")
-            time.sleep(1)
-        print("   Done!    ")
+        # Single wait instead of a per-second print/sleep loop; Ctrl-C
+        # still interrupts immediately
+        threading.Event().wait(5.0)
+        print("   Done!")
         
         # Step 6: Execute Exit
         print("\n🔴 STEP 6: Executing EXIT (Sell Spot + Close Perp)")
@@ -265,29 +314,44 @@ class LiveTradingTest:
         print(f"   Current prices: Spot ${spot_bid:.4f} / Perp ${perp_ask:.4f}")
         
         # Use slightly aggressive prices
-        exit_spot_price = round(spot_bid * 0.999, 4)  # 0.1% below bid
-        exit_perp_price = round(perp_ask * 1.001, 4)  # 0.1% above ask
+        exit_spot_price = round(spot_bid * EXIT_SPOT_MULT, 4)
+        exit_perp_price = round(perp_ask * EXIT_PERP_MULT, 4)
         
         filled_spot_size = self.entry_spot_fill.get("size", size)
         filled_perp_size = self.entry_perp_fill.get("size", size)
         
-        # Sell spot
-        spot_result = self.place_spot_order(
-            is_buy=False,
-            size=filled_spot_size,
-            price=exit_spot_price
+        # Both exit legs in parallel as well
+        spot_future = self._executor.submit(
+            self.place_spot_order, False, filled_spot_size, exit_spot_price
         )
-        self.exit_spot_fill = self.parse_order_result(spot_result, "Spot Sell")
-        
-        # Close perp short
-        perp_result = self.place_perp_order(
-            is_buy=True,  # Buy to close short
-            size=filled_perp_size,
-            price=exit_perp_price,
-            reduce_only=True
+        perp_future = self._executor.submit(
+            self.place_perp_order, True, filled_perp_size, exit_perp_price,
+            True  # reduce_only: buy to close short
         )
+        spot_result = spot_future.result()
+        perp_result = perp_future.result()
+
+        self.exit_spot_fill = self.parse_order_result(spot_result, "Spot Sell")
         self.exit_perp_fill = self.parse_order_result(perp_result, "Perp Close")
-        
+
+        # Record the full cycle as one batched write to the event log
+        with trade_events.cycle():
+            trade_events.entry_executed(
+                self.entry_spot_fill["size"],
+                self.entry_spot_fill["price"],
+                self.entry_perp_fill["price"],
+                current_spread / 100
+            )
+            if self.exit_spot_fill.get("success") and self.exit_perp_fill.get("success"):
+                spot_pnl = (self.exit_spot_fill["price"] - self.entry_spot_fill["price"]) * self.entry_spot_fill["size"]
+                perp_pnl = (self.entry_perp_fill["price"] - self.exit_perp_fill["price"]) * self.entry_perp_fill["size"]
+                trade_events.exit_executed(
+                    self.exit_spot_fill["size"],
+                    self.exit_spot_fill["price"],
+                    self.exit_perp_fill["price"],
+                    spot_pnl + perp_pnl - self.total_fees
+                )
+
         # Step 7: Summary
         self._print_summary()
     
@@ -369,10 +433,9 @@ def main():
     print("    Press Ctrl+C within 5 seconds to cancel...\n")
     
     try:
-        for i in range(5, 0, -1):
-            print(f"    Starting in {i}...", end="\r")
-            time.sleep(1)
-        print("    Starting now!      \n")
+        print("    Starting in 5 seconds...")
+        threading.Event().wait(5.0)
+        print("    Starting now!\n")
     except KeyboardInterrupt:
         print("\n\n❌ Cancelled by user.")
         return
@@ -1,22 +1,53 @@
 """
 Trade Events - Shared state between bot and dashboard
 """
+import atexit
 import json
 import os
+import signal
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
 from datetime import datetime
 from typing import List, Dict, Any
 from dataclasses import dataclass, asdict
-import threading
 
-EVENTS_FILE = "trade_events.json"
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+    _loads = orjson.loads
+else:
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, separators=(',', ':')).encode()
+    _loads = json.loads
+
+# Append-only event log (one JSON object per line) plus a small sidecar
+# file for the aggregates. Appending a line is O(1) vs rewriting the
+# whole history on every event.
+EVENTS_FILE = "trade_events.jsonl"
+STATS_FILE = "trade_stats.json"
+
+# How long dirty events may sit in the append buffer before the
+# background thread flushes them to disk.
+FLUSH_INTERVAL = 0.25
+
+# Flush the append handle after this many buffered writes even if the
+# debounce interval has not elapsed yet.
+FLUSH_EVERY_N_EVENTS = 20
 
 @dataclass
 class TradeEvent:
-    timestamp: str
+    timestamp: int  # ns since epoch; formatted to ISO only at read time
     event_type: str  # "entry", "exit", "opportunity", "error"
     message: str
     details: Dict[str, Any] = None
-    
+
     def to_dict(self):
         return {
             "timestamp": self.timestamp,
@@ -27,57 +58,200 @@ class TradeEvent:
 
 class TradeEventManager:
     """Manages trade events for communication between bot and dashboard."""
-    
+
     _instance = None
     _lock = threading.Lock()
-    
+
     def __new__(cls):
+        # Double-checked locking: the unlocked fast path serves every
+        # call after construction; the lock ensures two threads racing
+        # the first call can't both build (and _load) an instance.
         if cls._instance is None:
-            cls._instance = super().__new__(cls)
-            cls._instance._events = []
-            cls._instance._trades_executed = 0
-            cls._instance._total_pnl = 0.0
-            cls._instance._current_position = None
-            cls._instance._load()
+            with cls._lock:
+                if cls._instance is None:
+                    inst = super().__new__(cls)
+                    # deque.append is atomic under the GIL, so producers never
+                    # take a lock; maxlen enforces the 100-event window for free
+                    inst._events = deque(maxlen=100)
+                    inst._trades_executed = 0
+                    inst._total_pnl = 0.0
+                    inst._current_position = None
+                    inst._dirty = False
+                    inst._last_flush = 0.0
+                    inst._flush_interval = FLUSH_INTERVAL
+                    inst._append_fh = None
+                    inst._unflushed_writes = 0
+                    inst._events_mtime = -1.0
+                    inst._stats_mtime = -1.0
+                    inst._next_refresh = 0.0
+                    inst._in_cycle = False
+                    inst._load()
+                    inst._start_flush_thread()
+                    # Publish only once fully initialized
+                    cls._instance = inst
         return cls._instance
-    
+
+    def _start_flush_thread(self):
+        """Start the background flusher and register shutdown hooks."""
+        thread = threading.Thread(target=self._flush_loop, daemon=True)
+        thread.start()
+        atexit.register(self._save)
+        try:
+            previous = signal.getsignal(signal.SIGTERM)
+
+            def _on_sigterm(signum, frame):
+                # Never block on the lock here: the signal may have
+                # interrupted code that already holds it, and the lock
+                # is not reentrant - a blocking _save() would deadlock
+                # the shutdown. If the lock is busy a save is already in
+                # flight; atexit covers the rest on a graceful exit.
+                if self._lock.acquire(blocking=False):
+                    try:
+                        self._save_locked()
+                    finally:
+                        self._lock.release()
+                if callable(previous):
+                    previous(signum, frame)
+                else:
+                    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                    signal.raise_signal(signal.SIGTERM)
+
+            signal.signal(signal.SIGTERM, _on_sigterm)
+        except ValueError:
+            # Not in the main thread - atexit still covers normal shutdown
+            pass
+
+    def _flush_loop(self):
+        """Flush dirty events to disk periodically."""
+        while True:
+            time.sleep(self._flush_interval)
+            if self._dirty and not self._in_cycle:
+                self._save()
+
+    @contextmanager
+    def cycle(self):
+        """Batch every event in a trade cycle into one flush.
+
+        Inside the block, add_event/entry_executed/exit_executed skip
+        their individual saves; one _save commits the whole cycle on
+        exit, so the dashboard sees a consistent entry+exit pair rather
+        than intermediate half-states.
+        """
+        self._in_cycle = True
+        try:
+            yield self
+        finally:
+            self._in_cycle = False
+            self._save()
+
+    @staticmethod
+    def _mtime(path: str) -> float:
+        """File mtime, or 0.0 if the file does not exist."""
+        try:
+            return os.stat(path).st_mtime
+        except OSError:
+            return 0.0
+
     def _load(self):
-        """Load events from file."""
+        """Load the last 100 events and the aggregates from disk."""
+        # Skip the re-read entirely when nothing changed on disk - the
+        # dashboard polls this path constantly and usually hits memory.
+        events_mtime = self._mtime(EVENTS_FILE)
+        stats_mtime = self._mtime(STATS_FILE)
+        if events_mtime == self._events_mtime and stats_mtime == self._stats_mtime:
+            return
+        self._events_mtime = events_mtime
+        self._stats_mtime = stats_mtime
+
         if os.path.exists(EVENTS_FILE):
             try:
                 with open(EVENTS_FILE, 'r') as f:
-                    data = json.load(f)
-                    self._events = data.get("events", [])[-100:]  # Keep last 100
+                    # Tail read: only keep the last 100 lines
+                    tail = deque(f, maxlen=100)
+                events = []
+                for line in tail:
+                    line = line.strip()
+                    if line:
+                        try:
+                            events.append(_loads(line))
+                        except ValueError:
+                            continue  # Skip partial/corrupt lines
+                self._events = deque(events, maxlen=100)
+            except:
+                pass
+
+        if os.path.exists(STATS_FILE):
+            try:
+                with open(STATS_FILE, 'rb') as f:
+                    data = _loads(f.read())
                     self._trades_executed = data.get("trades_executed", 0)
                     self._total_pnl = data.get("total_pnl", 0.0)
                     self._current_position = data.get("current_position")
             except:
                 pass
-    
+
+    def _append_handle(self):
+        """Get the cached append handle for the event log."""
+        if self._append_fh is None:
+            self._append_fh = open(EVENTS_FILE, 'ab')
+        return self._append_fh
+
     def _save(self):
-        """Save events to file."""
+        """Flush pending event appends and write the stats sidecar."""
         with self._lock:
-            data = {
-                "events": self._events[-100:],
-                "trades_executed": self._trades_executed,
-                "total_pnl": self._total_pnl,
-                "current_position": self._current_position,
-                "last_update": datetime.now().isoformat()
-            }
-            with open(EVENTS_FILE, 'w') as f:
-                json.dump(data, f, indent=2)
-    
+            self._save_locked()
+
+    def _save_locked(self):
+        """Save body without taking the lock. Caller holds the lock."""
+        if self._append_fh is not None:
+            self._append_fh.flush()
+            self._unflushed_writes = 0
+        self._save_stats()
+        self._dirty = False
+        self._last_flush = time.monotonic()
+        # Our own writes don't need to be re-read on the next _load
+        self._events_mtime = self._mtime(EVENTS_FILE)
+        self._stats_mtime = self._mtime(STATS_FILE)
+
+    def _save_stats(self):
+        """Write the small aggregates sidecar. Caller holds the lock."""
+        data = {
+            "trades_executed": self._trades_executed,
+            "total_pnl": self._total_pnl,
+            "current_position": self._current_position,
+            "last_update": datetime.now().isoformat()
+        }
+        # Write-to-temp + atomic rename so a crash mid-write can never
+        # leave a truncated/half-written sidecar behind. No fsync on the
+        # common path - durability is the debounced flush's job.
+        tmp = STATS_FILE + ".tmp"
+        with open(tmp, 'wb') as f:
+            f.write(_dumps(data))
+        os.replace(tmp, STATS_FILE)
+
     def add_event(self, event_type: str, message: str, details: Dict = None):
         """Add a trade event."""
+        # time_ns is a single syscall; isoformat() would allocate a
+        # string per event for no benefit until someone reads it
         event = TradeEvent(
-            timestamp=datetime.now().isoformat(),
+            timestamp=time.time_ns(),
             event_type=event_type,
             message=message,
             details=details
         )
-        self._events.append(event.to_dict())
-        self._save()
-    
+        event_dict = event.to_dict()
+        self._events.append(event_dict)
+
+        # O(1) append to the log; flushing is debounced
+        self._append_handle().write(_dumps(event_dict) + b"\n")
+        self._unflushed_writes += 1
+        self._dirty = True
+        if self._in_cycle:
+            return
+        if (self._unflushed_writes >= FLUSH_EVERY_N_EVENTS
+                or time.monotonic() - self._last_flush > self._flush_interval):
+            self._save()
+
     def entry_executed(self, size: float, spot_price: float, perp_price: float, spread: float):
         """Record an entry trade."""
         self._current_position = {
@@ -92,7 +266,9 @@ class TradeEventManager:
             f"🟢 ENTRY: {size} HYPE @ Spot ${spot_price:.2f}, Perp ${perp_price:.2f}",
             {"size": size, "spot_price": spot_price, "perp_price": perp_price, "spread": spread}
         )
-    
+        if not self._in_cycle:
+            self._save()
+
     def exit_executed(self, size: float, spot_price: float, perp_price: float, net_pnl: float):
         """Record an exit trade."""
         self._trades_executed += 1
@@ -103,31 +279,62 @@ class TradeEventManager:
             f"🔴 EXIT: {size} HYPE @ Spot ${spot_price:.2f}, Perp ${perp_price:.2f} | P&L: ${net_pnl:+.4f}",
             {"size": size, "spot_price": spot_price, "perp_price": perp_price, "net_pnl": net_pnl}
         )
-    
+        if not self._in_cycle:
+            self._save()
+
     def error(self, message: str, details: Dict = None):
         """Record an error."""
         self.add_event("error", f"⚠️ ERROR: {message}", details)
-    
+
+    def _maybe_refresh(self):
+        """Refresh from disk on read, but only for reader processes.
+
+        The process that writes events (the bot) keeps the authoritative
+        copy in memory and never needs to re-read its own files. Reader
+        processes (the dashboard) poll the files at most once per second
+        instead of on every call.
+        """
+        if self._append_fh is not None:
+            return  # This process is the writer
+        now = time.monotonic()
+        if now < self._next_refresh:
+            return
+        self._next_refresh = now + 1.0
+        self._load()
+
     def get_events(self, limit: int = 50) -> List[Dict]:
-        """Get recent events."""
-        self._load()  # Refresh from file
-        return self._events[-limit:]
-    
+        """Get recent events (timestamps rendered as ISO strings)."""
+        self._maybe_refresh()
+        events = []
+        for event in list(self._events)[-limit:]:
+            ts = event.get("timestamp")
+            if isinstance(ts, int):
+                event = dict(event)
+                event["timestamp"] = datetime.fromtimestamp(ts / 1e9).isoformat()
+            events.append(event)
+        return events
+
     def get_stats(self) -> Dict:
         """Get current stats."""
-        self._load()  # Refresh from file
+        self._maybe_refresh()
         return {
             "trades_executed": self._trades_executed,
             "total_pnl": self._total_pnl,
             "current_position": self._current_position
         }
-    
+
     def reset(self):
         """Reset all events and stats."""
-        self._events = []
-        self._trades_executed = 0
-        self._total_pnl = 0.0
-        self._current_position = None
+        with self._lock:
+            self._events = deque(maxlen=100)
+            self._trades_executed = 0
+            self._total_pnl = 0.0
+            self._current_position = None
+            if self._append_fh is not None:
+                self._append_fh.close()
+                self._append_fh = None
+            # Truncate the event log
+            open(EVENTS_FILE, 'w').close()
         self._save()
 
 
@@ -8,18 +8,34 @@ Maintains local state of best bid/ask prices for immediate spread calculations.
 import asyncio
 import json
 import logging
+import random
+import time
+from collections import deque
 from typing import Callable, Dict, Optional, Any
 from dataclasses import dataclass, field
 import websockets
 from websockets.exceptions import ConnectionClosed
 
+try:
+    import orjson
+    _loads = orjson.loads
+    _dumps = orjson.dumps
+except ImportError:
+    _loads = json.loads
+
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, separators=(',', ':')).encode()
+
 import config
 
 logging.basicConfig(level=getattr(logging, config.LOG_LEVEL))
 logger = logging.getLogger(__name__)
 
+# Bound once so the per-tick timestamp skips a module attribute lookup
+_now = time.time
 
-@dataclass
+
+@dataclass(slots=True)
 class OrderBookState:
     """Holds the current state of an order book."""
     symbol: str
@@ -28,21 +44,40 @@ class OrderBookState:
     bid_size: float = 0.0
     ask_size: float = 0.0
     last_update: float = 0.0
-    
+    # Reciprocals maintained at update time so the spread math can
+    # multiply instead of divide on every call
+    inv_bid: float = 0.0
+    inv_ask: float = 0.0
+
     def is_valid(self) -> bool:
         """Check if we have valid prices."""
         return self.best_bid > 0 and self.best_ask > 0
 
 
-@dataclass
+@dataclass(slots=True)
 class PriceState:
-    """Combined price state for both markets."""
+    """Combined price state for both markets.
+
+    Layout note: the two books are kept as slotted objects mutated in
+    place rather than rows of a NumPy structured array. With only two
+    markets and purely scalar reads, slot attribute access beats NumPy
+    scalar indexing; revisit the SoA layout only if this grows into
+    multi-pair scans or windowed history.
+    """
     spot: OrderBookState = field(default_factory=lambda: OrderBookState(symbol=config.SPOT_SYMBOL))
     perp: OrderBookState = field(default_factory=lambda: OrderBookState(symbol=config.PERP_SYMBOL))
-    
+    # Cached readiness: while both books stay two-sided the per-tick
+    # check collapses to a single attribute load. _update_book clears
+    # this whenever it writes a zero price, so an emptied side drops
+    # back to the full recheck instead of spreads computed against 0.0.
+    _ready: bool = False
+
     def is_ready(self) -> bool:
         """Check if both markets have valid prices."""
-        return self.spot.is_valid() and self.perp.is_valid()
+        if self._ready:
+            return True
+        self._ready = self.spot.is_valid() and self.perp.is_valid()
+        return self._ready
     
     def get_entry_spread(self) -> float:
         """
@@ -51,7 +86,7 @@ class PriceState:
         """
         if not self.is_ready():
             return 0.0
-        return (self.perp.best_bid - self.spot.best_ask) / self.spot.best_ask
+        return (self.perp.best_bid - self.spot.best_ask) * self.spot.inv_ask
     
     def get_exit_spread(self) -> float:
         """
@@ -60,7 +95,20 @@ class PriceState:
         """
         if not self.is_ready():
             return float('inf')
-        return (self.perp.best_ask - self.spot.best_bid) / self.spot.best_bid
+        return (self.perp.best_ask - self.spot.best_bid) * self.spot.inv_bid
+
+    def get_spreads(self) -> tuple:
+        """Entry and exit spreads in one pass.
+
+        Callers that need both (the strategy does, every tick) get them
+        with a single readiness check and one walk over the book fields.
+        """
+        if not self.is_ready():
+            return 0.0, float('inf')
+        spot = self.spot
+        perp = self.perp
+        return ((perp.best_bid - spot.best_ask) * spot.inv_ask,
+                (perp.best_ask - spot.best_bid) * spot.inv_bid)
 
 
 class WebSocketManager:
@@ -88,6 +136,38 @@ class WebSocketManager:
         self._ws: Optional[websockets.WebSocketClientProtocol] = None
         self._running = False
         self._reconnect_delay = config.WS_RECONNECT_DELAY
+
+        # Coin -> book dispatch table; the book objects are mutated in
+        # place so these references stay valid for the manager lifetime.
+        # Scales to more symbols without growing a branch chain.
+        self._books = {
+            config.SPOT_SYMBOL: self.price_state.spot,
+            config.PERP_SYMBOL: self.price_state.perp,
+        }
+
+        # Subscription payloads never change - encode them once instead
+        # of rebuilding dict + JSON on every (re)connect
+        self._sub_frames = {
+            sym: _dumps({"method": "subscribe",
+                         "subscription": {"type": "l2Book", "coin": sym}})
+            for sym in (config.SPOT_SYMBOL, config.PERP_SYMBOL)
+        }
+
+        # Scan tokens for the raw fast path, for str and bytes frames:
+        # (channel marker, coin key, px key, sz key, levels key,
+        #  bids/asks separator, closing quote)
+        self._raw_tokens = {
+            str: ('"channel":"l2Book"', '"coin":"', '"px":"', '"sz":"',
+                  '"levels":', '}],[{', '"'),
+            bytes: (b'"channel":"l2Book"', b'"coin":"', b'"px":"', b'"sz":"',
+                    b'"levels":', b'}],[{', b'"'),
+        }
+
+        # Deliberately looser than the compact-serialization tokens above:
+        # a frame that merely mentions l2Book anywhere still takes the
+        # JSON path, so a formatting change on the wire degrades to the
+        # parser instead of silently dropping every book frame
+        self._l2_hints = {str: 'l2Book', bytes: b'l2Book'}
         
     async def connect(self) -> None:
         """Establish WebSocket connection and start listening."""
@@ -99,7 +179,10 @@ class WebSocketManager:
                 async with websockets.connect(
                     self.ws_url,
                     ping_interval=config.WS_PING_INTERVAL,
-                    ping_timeout=10
+                    ping_timeout=10,
+                    compression=None,  # skip per-frame zlib; book frames are tiny
+                    max_size=65536,    # L2 frames are a few KB; default is 1MB
+                    max_queue=32
                 ) as ws:
                     self._ws = ws
                     self._reconnect_delay = config.WS_RECONNECT_DELAY  # Reset on successful connect
@@ -119,8 +202,12 @@ class WebSocketManager:
                 logger.error(f"WebSocket error: {e}")
             
             if self._running:
-                logger.info(f"Reconnecting in {self._reconnect_delay}s...")
-                await asyncio.sleep(self._reconnect_delay)
+                # Jitter the sleep (±50%) so multiple instances don't hammer
+                # the endpoint in lockstep after an outage; the undecorated
+                # delay keeps doubling up to the configured cap
+                sleep_for = self._reconnect_delay * random.uniform(0.5, 1.5)
+                logger.info("Reconnecting in %.1fs...", sleep_for)
+                await asyncio.sleep(sleep_for)
                 # Exponential backoff
                 self._reconnect_delay = min(
                     self._reconnect_delay * 2,
@@ -131,38 +218,122 @@ class WebSocketManager:
         """Subscribe to L2 order book for a symbol."""
         if not self._ws:
             return
-            
-        subscription = {
-            "method": "subscribe",
-            "subscription": {
-                "type": "l2Book",
-                "coin": symbol
-            }
-        }
-        
-        await self._ws.send(json.dumps(subscription))
-        logger.debug(f"Subscribed to L2 book: {symbol}")
+
+        await self._ws.send(self._sub_frames[symbol])
+        logger.debug("Subscribed to L2 book: %s", symbol)
     
     async def _listen(self) -> None:
-        """Listen for WebSocket messages and update state."""
+        """Listen for WebSocket messages and update state.
+
+        Reading and handling are pipelined: a producer task drains the
+        socket into a bounded deque while the consumer parses, so the
+        network read isn't blocked on the previous frame's handling.
+        """
         if not self._ws:
             return
-            
-        async for message in self._ws:
+
+        frames: deque = deque(maxlen=64)  # drop-oldest under pressure
+        frame_ready = asyncio.Event()
+        closed = False
+
+        async def read_frames():
+            nonlocal closed
             try:
-                data = json.loads(message)
-                await self._handle_message(data)
-            except json.JSONDecodeError as e:
-                logger.error(f"Failed to parse message: {e}")
-            except Exception as e:
-                logger.error(f"Error handling message: {e}")
+                async for message in self._ws:
+                    frames.append(message)
+                    frame_ready.set()
+            finally:
+                closed = True
+                frame_ready.set()  # wake the consumer so it can exit
+
+        async def handle_frames():
+            while True:
+                await frame_ready.wait()
+                frame_ready.clear()
+                while frames:
+                    message = frames.popleft()
+                    try:
+                        # Raw scan first; JSON parse only for frames it
+                        # can't handle
+                        if self._handle_raw(message):
+                            continue
+                        # Frames that don't mention l2Book at all (pongs,
+                        # heartbeats) aren't worth a JSON parse; the two
+                        # subscription echoes per connect match the loose
+                        # hint and just take the cheap JSON path
+                        hint = self._l2_hints.get(type(message))
+                        if hint is not None and hint not in message:
+                            logger.debug("Ignoring non-l2Book frame: %.80s", message)
+                            continue
+                        self._handle_message(_loads(message))
+                    except ValueError as e:
+                        logger.error("Failed to parse message: %s", e)
+                    except Exception as e:
+                        logger.error("Error handling message: %s", e)
+                if closed:
+                    return
+
+        try:
+            async with asyncio.TaskGroup() as tg:
+                tg.create_task(read_frames())
+                tg.create_task(handle_frames())
+        except* ConnectionClosed as eg:
+            # The TaskGroup wraps child failures in an ExceptionGroup;
+            # re-raise the close bare so connect()'s ConnectionClosed
+            # branch keeps logging the code/reason as a routine warning
+            raise eg.exceptions[0] from None
+
+    @staticmethod
+    def _scan_value(message, key, quote, start: int) -> float:
+        """Read the quoted value following the first `key` after `start`."""
+        pos = message.index(key, start) + len(key)
+        return float(message[pos:message.index(quote, pos)])
+
+    def _handle_raw(self, message) -> bool:
+        """Extract top-of-book from an l2Book frame without JSON parsing.
+
+        We only need the coin and four top-of-book floats out of each
+        frame, so a handful of substring scans beats building the full
+        dict. Returns True if the frame was fully handled; anything with
+        an unexpected shape (empty book side, other channels) falls back
+        to the JSON path.
+        """
+        tokens = self._raw_tokens.get(type(message))
+        if tokens is None:
+            return False
+        channel, coin_key, px_key, sz_key, levels_key, side_sep, quote = tokens
+        if channel not in message:
+            return False
+
+        try:
+            pos = message.index(coin_key) + len(coin_key)
+            coin = message[pos:message.index(quote, pos)]
+            levels_at = message.index(levels_key, pos)
+            # First px/sz after "levels" is bids[0]; the }],[{ separator
+            # marks where the asks side starts
+            asks_at = message.index(side_sep, levels_at)
+            best_bid = self._scan_value(message, px_key, quote, levels_at)
+            bid_size = self._scan_value(message, sz_key, quote, levels_at)
+            best_ask = self._scan_value(message, px_key, quote, asks_at)
+            ask_size = self._scan_value(message, sz_key, quote, asks_at)
+        except ValueError:
+            return False
+
+        if isinstance(coin, bytes):
+            coin = coin.decode()
+        self._update_book(coin, best_bid, best_ask, bid_size, ask_size)
+        return True
     
-    async def _handle_message(self, data: Dict[str, Any]) -> None:
-        """Process incoming WebSocket message and update price state."""
+    def _handle_message(self, data: Dict[str, Any]) -> None:
+        """Process incoming WebSocket message and update price state.
+
+        Plain def on purpose: the handler is pure CPU, and awaiting it
+        added scheduler round-trips to every frame.
+        """
         channel = data.get("channel")
         
         if channel == "subscriptionResponse":
-            logger.debug(f"Subscription confirmed: {data}")
+            logger.debug("Subscription confirmed: %s", data)
             return
         
         if channel == "l2Book":
@@ -179,35 +350,39 @@ class WebSocketManager:
             best_ask = float(asks[0]["px"]) if asks else 0.0
             bid_size = float(bids[0]["sz"]) if bids else 0.0
             ask_size = float(asks[0]["sz"]) if asks else 0.0
-            
-            # Update appropriate order book
-            import time
-            timestamp = time.time()
-            
-            if coin == config.SPOT_SYMBOL:
-                self.price_state.spot = OrderBookState(
-                    symbol=coin,
-                    best_bid=best_bid,
-                    best_ask=best_ask,
-                    bid_size=bid_size,
-                    ask_size=ask_size,
-                    last_update=timestamp
-                )
-                logger.debug(f"Spot update: bid={best_bid}, ask={best_ask}")
-                
-            elif coin == config.PERP_SYMBOL:
-                self.price_state.perp = OrderBookState(
-                    symbol=coin,
-                    best_bid=best_bid,
-                    best_ask=best_ask,
-                    bid_size=bid_size,
-                    ask_size=ask_size,
-                    last_update=timestamp
-                )
-                logger.debug(f"Perp update: bid={best_bid}, ask={best_ask}")
-            
-            # Trigger callback if set
-            if self.on_price_update and self.price_state.is_ready():
+
+            self._update_book(coin, best_bid, best_ask, bid_size, ask_size)
+
+    def _update_book(self, coin: str, best_bid: float, best_ask: float,
+                     bid_size: float, ask_size: float) -> None:
+        """Update one market's book state and trigger the price callback."""
+        # Mutate the existing state in place - allocating a fresh
+        # OrderBookState hundreds of times per second just churns the GC
+        book = self._books.get(coin)
+        if book is None:
+            return
+
+        book.best_bid = best_bid
+        book.best_ask = best_ask
+        book.bid_size = bid_size
+        book.ask_size = ask_size
+        book.inv_bid = 1.0 / best_bid if best_bid else 0.0
+        book.inv_ask = 1.0 / best_ask if best_ask else 0.0
+        book.last_update = _now()
+        if best_bid <= 0.0 or best_ask <= 0.0:
+            # An emptied side invalidates the cached readiness - a
+            # stale True here would let the spread getters multiply
+            # against a zero price and report a phantom 0.0 spread
+            self.price_state._ready = False
+        logger.debug("%s update: bid=%s, ask=%s", coin, best_bid, best_ask)
+
+        # Schedule the callback instead of running it inline, so a slow
+        # consumer can't stall the websocket read loop mid-frame
+        if self.on_price_update and self.price_state.is_ready():
+            try:
+                asyncio.get_running_loop().call_soon(self.on_price_update, self.price_state)
+            except RuntimeError:
+                # No running loop (direct/synchronous use)
                 self.on_price_update(self.price_state)
     
     def get_prices(self) -> PriceState:
@@ -229,20 +404,14 @@ class WebSocketManager:
         try:
             logger.info("Testing WebSocket connection...")
             
-            async with websockets.connect(self.ws_url, close_timeout=5) as ws:
-                # Subscribe to perp book as a test
-                subscription = {
-                    "method": "subscribe",
-                    "subscription": {
-                        "type": "l2Book",
-                        "coin": config.PERP_SYMBOL
-                    }
-                }
-                await ws.send(json.dumps(subscription))
-                
+            async with websockets.connect(self.ws_url, close_timeout=5, compression=None) as ws:
+                # Subscribe to perp book as a test - the pre-encoded
+                # bytes frame goes out without a str->utf-8 re-encode
+                await ws.send(self._sub_frames[config.PERP_SYMBOL])
+
                 # Wait for response
                 response = await asyncio.wait_for(ws.recv(), timeout=5)
-                data = json.loads(response)
+                data = _loads(response)
                 
                 logger.info(f"✅ Connection test successful! Received: {data.get('channel')}")
                 return True
@@ -254,6 +423,12 @@ class WebSocketManager:
 
 # Quick test
 if __name__ == "__main__":
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+
     async def on_update(state: PriceState):
         spread = state.get_entry_spread()
         print(f"Spot: {state.spot.best_bid}/{state.spot.best_ask} | "